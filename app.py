@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import textwrap
-from typing import Tuple
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import streamlit as st
@@ -13,7 +13,20 @@ from src.brain_data import (
     get_region_full_name,
     load_region_mesh,
     load_root_brain_mesh,
+    preload_region_meshes,
 )
+from src.mesh_export import (
+    baked_mesh_path,
+    extract_plotly_data,
+    load_baked_mesh3d,
+    load_baked_mesh_stats,
+    merge_plotly_arrays,
+    mesh3d_arrays,
+    voxel_center_arrays,
+)
+from src.voxelize import voxel_spacing, voxelize_mesh
+
+CSS_PATH = Path(__file__).resolve().parent / "static" / "voxelith.css"
 
 st.set_page_config(
     page_title="Voxelith",
@@ -21,59 +34,14 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(
-    """
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@300;400;600&display=swap');
-
-    h1, h2, h3, h4 {
-        font-family: 'Playfair Display', serif !important;
-        font-weight: 300 !important;
-    }
-
-    html, body, [class*='css'] {
-        font-family: 'Inter', sans-serif;
-        font-size: 0.85rem;
-    }
-
-    [data-testid="stSidebar"], [class*='stSelectbox'], [class*='stMultiSelect'],
-    [class*='stCheckbox'], [class*='stToggle'], button, input, [class*='stTextInput'] {
-        border-radius: 0px !important;
-    }
-
-    [class*='stSelectbox'] > div, [class*='stMultiSelect'] > div,
-    input, [data-baseweb="input"] {
-        border-color: #222222 !important;
-    }
-
-    #MainMenu { visibility: hidden; }
-    footer { visibility: hidden; }
-    header { visibility: hidden; }
-
-    .block-container {
-        padding-top: 1rem;
-        padding-bottom: 0rem;
-        padding-left: 1rem;
-        padding-right: 1rem;
-    }
-
-    span[data-baseweb='tag'] {
-        background-color: #ffffff !important;
-        border: 1px solid #ffffff !important;
-        border-radius: 0px !important;
-    }
-    span[data-baseweb='tag'] span {
-        color: #000000 !important;
-    }
-    div[role='listbox'] {
-        background-color: #111111 !important;
-        color: #ffffff !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+
+@st.cache_data
+def load_css() -> str:
+    """Read the app stylesheet (cached so reruns skip the disk read)."""
+    return CSS_PATH.read_text()
+
+
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 PATHOLOGY_MAP = {
     "None": [],
@@ -87,6 +55,9 @@ PATHOLOGY_COLORS = {
     "Glioblastoma (Butterfly)": "#FF4500",
 }
 
+VOXEL_RESOLUTION = 30  # voxels along each mesh's X extent
+VOXEL_MARKER = dict(size=3, symbol="square")
+
 HIGHLIGHT_COLORS = [
     "#00FFFF",   # Cyan
     "#FF00FF",   # Magenta
@@ -97,13 +68,26 @@ HIGHLIGHT_COLORS = [
 ]
 
 
-@st.cache_data
+@st.cache_resource
 def get_cached_root_mesh() -> pv.PolyData:
     """Load the root (whole brain) mesh (cached to avoid repeated disk reads)."""
     return load_root_brain_mesh()
 
 
-@st.cache_data
+@st.cache_resource
+def get_cached_root_mesh_lod(target_reduction: float = 0.9) -> pv.PolyData:
+    """
+    Decimated root mesh for the glass brain context (cached).
+
+    The root is only drawn translucent and without hover, so a ~10x coarser
+    surface is visually equivalent and far cheaper to triangulate and send.
+    """
+    return get_cached_root_mesh().triangulate().decimate_pro(
+        target_reduction, preserve_topology=True
+    )
+
+
+@st.cache_resource
 def get_cached_region_mesh(region_name: str) -> pv.PolyData:
     """Load a region mesh (cached to avoid repeated disk reads)."""
     return load_region_mesh(region_name)
@@ -115,33 +99,131 @@ def get_cached_region_name(region_acronym: str) -> str:
     return get_region_full_name(region_acronym)
 
 
-def get_voxelized_surface(mesh: pv.PolyData, resolution: int = 30) -> pv.PolyData:
+def get_voxel_grid(
+    mesh: pv.PolyData, resolution: int = VOXEL_RESOLUTION
+) -> Tuple[pv.UnstructuredGrid, float]:
+    """Voxelize a mesh, returning the voxel grid and the voxel size."""
+    voxel_size = voxel_spacing(mesh, resolution)
+    return voxelize_mesh(mesh, spacing=voxel_size), voxel_size
+
+
+@st.cache_data
+def get_cached_root_plotly() -> Dict[str, np.ndarray]:
+    """Mesh3d arrays for the decimated root mesh (cached so reruns skip triangulation)."""
+    return mesh3d_arrays(*extract_plotly_data(get_cached_root_mesh_lod()))
+
+
+@st.cache_data
+def get_cached_root_voxel_plotly(resolution: int = VOXEL_RESOLUTION) -> Dict[str, np.ndarray]:
+    """Voxel center arrays for the decimated root mesh (cached)."""
+    vox, _ = get_voxel_grid(get_cached_root_mesh_lod(), resolution)
+    return voxel_center_arrays(vox)
+
+
+@st.cache_data
+def get_cached_region_plotly(region_name: str) -> Dict[str, np.ndarray]:
+    """
+    Mesh3d arrays for a region mesh (cached so reruns skip triangulation).
+
+    Uses the pre-extracted arrays from scripts/bake_meshes.py when present and
+    falls back to loading and triangulating the atlas mesh otherwise.
     """
-    Voxelize a mesh and return its outer surface as triangulated PolyData for Plotly.
+    baked = load_baked_mesh3d(region_name)
+    if baked is not None:
+        return baked
+    return mesh3d_arrays(*extract_plotly_data(get_cached_region_mesh(region_name)))
 
-    Density is computed from the mesh X extent and resolution (voxels along that axis).
+
+@st.cache_data
+def get_cached_region_stats(region_name: str) -> Tuple[float, Tuple[float, float, float]]:
     """
-    x_length = mesh.bounds[1] - mesh.bounds[0]
-    density = x_length / resolution
-    vox = mesh.voxelize(spacing=density)
-    return vox.extract_geometry().triangulate()
+    Volume (µm³) and bounding-box center of a region mesh (cached).
 
+    Read from the baked arrays when present, so the surface view never has to
+    parse the atlas mesh for them.
+    """
+    baked = load_baked_mesh_stats(region_name)
+    if baked is not None:
+        return baked
+    mesh = get_cached_region_mesh(region_name)
+    return mesh.volume, tuple(mesh.center)
 
-def extract_plotly_data(mesh: pv.PolyData) -> Tuple[np.ndarray, np.ndarray]:
+
+def heatmap_intensity(mesh_arrays: Dict[str, np.ndarray], center: Tuple[float, float, float]) -> np.ndarray:
     """
-    Extract vertices and faces from a PyVista mesh for Plotly Mesh3d.
-
-    Returns
-    -------
-    vertices : np.ndarray
-        mesh.points after triangulate().
-    faces : np.ndarray
-        mesh.faces reshaped to (n_triangles, 3) vertex indices.
+    Per-vertex heatmap intensity: 1.0 at the mesh center, falling to 0.0 at the farthest vertex.
+
+    Squared distances come from one fused einsum reduction; normalization, sqrt
+    and inversion then run in place on that float32 buffer, so no further
+    temporaries are allocated.
     """
-    mesh = mesh.triangulate()
-    vertices = mesh.points
-    faces = mesh.faces.reshape(-1, 4)[:, 1:]
-    return vertices, faces
+    d = np.stack((mesh_arrays["x"], mesh_arrays["y"], mesh_arrays["z"]))
+    d -= np.asarray(center, dtype=d.dtype)[:, np.newaxis]
+    intensity = np.einsum("ij,ij->j", d, d)
+    d_max2 = intensity.max()
+    if d_max2 <= 0:
+        intensity.fill(1.0)
+        return intensity
+    intensity /= d_max2
+    np.sqrt(intensity, out=intensity)
+    np.subtract(1.0, intensity, out=intensity)
+    return intensity
+
+
+@st.cache_resource
+def voxelize_region(
+    region_name: str, resolution: int = VOXEL_RESOLUTION
+) -> Tuple[pv.UnstructuredGrid, float]:
+    """
+    Voxelize a region mesh (cached per region and resolution).
+
+    Returns the voxel grid and the voxel size, so the sidebar metrics and the
+    render loop share a single voxelization.
+    """
+    return get_voxel_grid(get_cached_region_mesh(region_name), resolution)
+
+
+@st.cache_data
+def voxel_centers_plotly(
+    region_name: str, resolution: int = VOXEL_RESOLUTION
+) -> Dict[str, np.ndarray]:
+    """Voxel center arrays for a voxelized region (cached)."""
+    vox, _ = voxelize_region(region_name, resolution)
+    return voxel_center_arrays(vox)
+
+
+@st.cache_data
+def compute_voxel_metrics(
+    regions: Tuple[str, ...], resolution: int = VOXEL_RESOLUTION, use_voxels: bool = False
+) -> Tuple[Dict[str, float], int, Optional[float]]:
+    """
+    Volume metrics for the rendered regions (cached per regions and resolution).
+
+    Returns per-region volumes in mm³ (voxel-based when use_voxels is set, mesh
+    volume otherwise), the total voxel count and the effective voxel size in µm.
+    Sidebar toggles that don't change the regions reuse the cached result.
+    """
+    volumes_mm3 = {}
+    total_voxel_count = 0
+    effective_resolution_um = None
+    for region in regions:
+        if use_voxels:
+            vox, voxel_size = voxelize_region(region, resolution)
+            total_voxel_count += vox.n_cells
+            if effective_resolution_um is None:
+                effective_resolution_um = voxel_size
+            vol_um3 = vox.n_cells * (voxel_size ** 3)
+        else:
+            vol_um3 = get_cached_region_stats(region)[0]
+        volumes_mm3[region] = vol_um3 / 1e9
+    return volumes_mm3, total_voxel_count, effective_resolution_um
+
+
+def load_region_plotly(region_name: str, use_voxels: bool) -> Dict[str, np.ndarray]:
+    """Plotly arrays for a region: voxel centers or surface mesh (cached)."""
+    if use_voxels:
+        return voxel_centers_plotly(region_name)
+    return get_cached_region_plotly(region_name)
 
 
 def main() -> None:
@@ -184,6 +266,8 @@ def main() -> None:
             help="Add preset regions for common pathologies.",
         )
         pathology_acronyms = PATHOLOGY_MAP.get(pathology_preset, [])
+        pathology_set = set(pathology_acronyms)
+        pathology_is_none = pathology_preset == "None"
         regions_to_render = list(
             dict.fromkeys(selected_regions + [a for a in pathology_acronyms if a in region_options])
         )
@@ -205,29 +289,27 @@ def main() -> None:
         total_voxel_count = 0
         effective_resolution_um = None
         if regions_to_render:
-            for region in regions_to_render:
-                region_mesh = get_cached_region_mesh(region)
-                vol_um3 = region_mesh.volume
-                if use_voxels:
-                    x_length = region_mesh.bounds[1] - region_mesh.bounds[0]
-                    voxel_size = x_length / 30.0
-                    vox = region_mesh.voxelize(spacing=voxel_size)
-                    total_voxel_count += vox.n_cells
-                    if effective_resolution_um is None:
-                        effective_resolution_um = voxel_size
-                    vol_um3 = vox.n_cells * (voxel_size ** 3)
-                total_volume_mm3 += vol_um3 / 1e9
-                if pathology_preset != "None" and region in pathology_acronyms:
-                    total_pathological_volume_mm3 += vol_um3 / 1e9
+            # Read the atlas meshes this rerun will need concurrently, up front;
+            # the cached loaders below then take them from src's mesh cache.
+            preload_region_meshes(
+                [r for r in regions_to_render if use_voxels or not baked_mesh_path(r).exists()]
+            )
+            region_volumes_mm3, total_voxel_count, effective_resolution_um = compute_voxel_metrics(
+                tuple(regions_to_render), VOXEL_RESOLUTION, use_voxels
+            )
+            for region, vol_mm3 in region_volumes_mm3.items():
+                total_volume_mm3 += vol_mm3
+                if not pathology_is_none and region in pathology_set:
+                    total_pathological_volume_mm3 += vol_mm3
                 is_lesion_rendered = (
                     not use_heatmap
-                    and (pathology_preset == "None" or region not in pathology_acronyms)
+                    and (pathology_is_none or region not in pathology_set)
                 )
                 if lesion_mode and is_lesion_rendered:
-                    total_lesion_volume_mm3 += vol_um3 / 1e9
+                    total_lesion_volume_mm3 += vol_mm3
         if lesion_mode and regions_to_render:
             st.metric("Estimated Lesion Volume", f"{total_lesion_volume_mm3:.2f} mm³")
-        if pathology_preset != "None" and pathology_acronyms:
+        if not pathology_is_none and pathology_acronyms:
             st.metric("Total Pathological Volume", f"{total_pathological_volume_mm3:.2f} mm³")
         if use_voxels and regions_to_render:
             st.divider()
@@ -243,107 +325,132 @@ def main() -> None:
     if show_glass_brain:
         with st.spinner("Loading whole brain..."):
             try:
-                root_mesh = get_cached_root_mesh()
                 if use_voxels:
-                    root_mesh = get_voxelized_surface(root_mesh)
-                verts, faces = extract_plotly_data(root_mesh)
-                fig.add_trace(
-                    go.Mesh3d(
-                        x=verts[:, 0],
-                        y=verts[:, 1],
-                        z=verts[:, 2],
-                        i=faces[:, 0],
-                        j=faces[:, 1],
-                        k=faces[:, 2],
+                    root_trace = go.Scatter3d(
+                        **get_cached_root_voxel_plotly(),
+                        mode="markers",
+                        marker=dict(VOXEL_MARKER, color="#B0BEC5", opacity=0.25),
+                        name="Whole Brain",
+                        hoverinfo="skip",
+                    )
+                else:
+                    root_trace = go.Mesh3d(
+                        **get_cached_root_plotly(),
                         color="#B0BEC5",
                         opacity=0.25,
                         name="Whole Brain",
                         hoverinfo="skip",
-                        lighting=dict(
-                            ambient=0.5,
-                            diffuse=0.4,
-                            fresnel=2.0,
-                            specular=0.5,
-                            roughness=0.1,
-                        ),
+                        # Translucent context only: flat, unlit shading is cheapest to draw.
+                        flatshading=True,
+                        lighting=dict(ambient=1.0, diffuse=0.0, specular=0.0),
                     )
-                )
+                fig.add_trace(root_trace)
             except Exception as exc:
                 st.error(f"Failed to load whole brain: {exc}")
                 st.stop()
 
     # Highlights: selected regions + pathology preset
+    if lesion_mode:
+        t = (lesion_severity - 0.1) / 0.9
+        r = int(139 + (26 - 139) * t)
+        g = int(0 + (26 - 0) * t)
+        b_val = int(0 + (26 - 0) * t)
+        lesion_color = f"rgb({r},{g},{b_val})"
+
+    def resolve_color(i: int, region: str) -> str:
+        if not pathology_is_none and region in pathology_set:
+            return PATHOLOGY_COLORS.get(pathology_preset, HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)])
+        if lesion_mode:
+            return lesion_color
+        return HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)]
+
+    colors_for_render = [resolve_color(i, region) for i, region in enumerate(regions_to_render)]
+
+    region_arrays = []
+    region_shading = []  # per-region color, or per-point intensity in heatmap mode
+    region_labels = []
+    region_names = []
+    region_colors = []
     for i, region in enumerate(regions_to_render):
         try:
-            mesh = get_cached_region_mesh(region)
-            if use_voxels:
-                mesh = get_voxelized_surface(mesh)
-            verts, faces = extract_plotly_data(mesh)
+            mesh_arrays = load_region_plotly(region, use_voxels)
             full_name = get_cached_region_name(region)
-            wrapped_name = "<br>".join(textwrap.wrap(full_name, width=30))
             if use_heatmap:
-                center = np.array(mesh.center)
-                distances = np.linalg.norm(verts - center, axis=1)
-                d_max = distances.max()
-                intensity = (1.0 - (distances / d_max)) if d_max > 0 else np.ones_like(distances)
-                mesh_trace = go.Mesh3d(
-                    x=verts[:, 0],
-                    y=verts[:, 1],
-                    z=verts[:, 2],
-                    i=faces[:, 0],
-                    j=faces[:, 1],
-                    k=faces[:, 2],
-                    intensity=intensity,
-                    colorscale="Viridis",
-                    showscale=True,
-                    opacity=0.85,
-                    name=full_name,
-                    hovertext=wrapped_name,
-                    hoverinfo="text",
-                    lighting=dict(
-                        ambient=0.6,
-                        diffuse=0.5,
-                        roughness=0.1,
-                        specular=0.8,
-                        fresnel=0.5,
-                    ),
+                if use_voxels:
+                    center = voxelize_region(region)[0].center
+                else:
+                    center = get_cached_region_stats(region)[1]
+                shading = heatmap_intensity(mesh_arrays, center)
+            else:
+                shading = colors_for_render[i]
+        except Exception as exc:
+            st.error(f"Error loading {region}: {exc}")
+            continue
+        region_arrays.append(mesh_arrays)
+        region_shading.append(shading)
+        region_labels.append(region)
+        region_names.append(full_name)
+        region_colors.append(colors_for_render[i])
+
+    # All highlighted regions go into a single trace (one WebGL draw call),
+    # with per-face/per-point colors. Hover shows the region acronym per point;
+    # repeating the full names per point bloats the figure JSON, so the full
+    # names go into one-point legend entries instead.
+    if region_arrays:
+        merged_arrays = merge_plotly_arrays(region_arrays)
+        points_per_region = [arrays["x"].size for arrays in region_arrays]
+        hovertext = np.repeat(region_labels, points_per_region)
+        if use_voxels:
+            if use_heatmap:
+                marker_color = dict(
+                    color=np.concatenate(region_shading), colorscale="Viridis", showscale=True
                 )
             else:
-                if pathology_preset != "None" and region in pathology_acronyms:
-                    color = PATHOLOGY_COLORS.get(
-                        pathology_preset, HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)]
-                    )
-                elif lesion_mode:
-                    t = (lesion_severity - 0.1) / 0.9
-                    r = int(139 + (26 - 139) * t)
-                    g = int(0 + (26 - 0) * t)
-                    b_val = int(0 + (26 - 0) * t)
-                    color = f"rgb({r},{g},{b_val})"
-                else:
-                    color = HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)]
-                mesh_trace = go.Mesh3d(
-                    x=verts[:, 0],
-                    y=verts[:, 1],
-                    z=verts[:, 2],
-                    i=faces[:, 0],
-                    j=faces[:, 1],
-                    k=faces[:, 2],
-                    color=color,
-                    opacity=0.85,
+                marker_color = dict(color=np.repeat(region_shading, points_per_region))
+            highlight_trace = go.Scatter3d(
+                **merged_arrays,
+                mode="markers",
+                marker=dict(VOXEL_MARKER, opacity=0.85, **marker_color),
+                name="Highlighted Regions",
+                hovertext=hovertext,
+                hoverinfo="text",
+            )
+        else:
+            if use_heatmap:
+                mesh_color = dict(
+                    intensity=np.concatenate(region_shading), colorscale="Viridis", showscale=True
+                )
+            else:
+                faces_per_region = [arrays["i"].size for arrays in region_arrays]
+                mesh_color = dict(facecolor=np.repeat(region_shading, faces_per_region))
+            highlight_trace = go.Mesh3d(
+                **merged_arrays,
+                **mesh_color,
+                opacity=0.85,
+                name="Highlighted Regions",
+                hovertext=hovertext,
+                hoverinfo="text",
+                lighting=dict(
+                    ambient=0.6,
+                    diffuse=0.5,
+                    roughness=0.1,
+                    specular=0.8,
+                    fresnel=0.5,
+                ),
+            )
+        fig.add_trace(highlight_trace)
+        for mesh_arrays, full_name, color in zip(region_arrays, region_names, region_colors):
+            fig.add_trace(
+                go.Scatter3d(
+                    x=mesh_arrays["x"][:1],
+                    y=mesh_arrays["y"][:1],
+                    z=mesh_arrays["z"][:1],
+                    mode="markers",
+                    marker=dict(size=3, color=color),
                     name=full_name,
-                    hovertext=wrapped_name,
-                    hoverinfo="text",
-                    lighting=dict(
-                        ambient=0.6,
-                        diffuse=0.5,
-                        roughness=0.1,
-                        specular=0.8,
-                        fresnel=0.5,
-                    ),
+                    hoverinfo="skip",
                 )
-            fig.add_trace(mesh_trace)
-        except Exception as exc:
-            st.error(f"Error loading {region}: {exc}")
+            )
 
     fig.update_layout(
         scene=dict(
@@ -0,0 +1,38 @@
+"""
+Pre-extract Plotly Mesh3d arrays, volume and center for every atlas region
+into data/baked/<atlas_name>/.
+
+In the surface view the app loads these instead of reading and triangulating
+the atlas meshes at runtime (the voxel view still needs the meshes). Run once from the repository root:
+
+    python scripts/bake_meshes.py
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.brain_data import get_region_acronyms, load_region_mesh  # noqa: E402
+from src.mesh_export import extract_plotly_data, mesh3d_arrays, save_baked_mesh3d  # noqa: E402
+
+
+def main() -> None:
+    acronyms = get_region_acronyms()
+    baked = 0
+    for acronym in acronyms:
+        try:
+            mesh = load_region_mesh(acronym)
+        except Exception as exc:
+            print(f"Skipping {acronym}: {exc}")
+            continue
+        save_baked_mesh3d(
+            acronym, mesh3d_arrays(*extract_plotly_data(mesh)), mesh.volume, mesh.center
+        )
+        baked += 1
+    print(f"Baked {baked}/{len(acronyms)} regions.")
+
+
+if __name__ == "__main__":
+    main()
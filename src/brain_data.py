@@ -1,36 +1,71 @@
 from __future__ import annotations
 
-from typing import Sequence, Union
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from brainglobe_atlasapi.bg_atlas import BrainGlobeAtlas
-import numpy as np
 import pyvista as pv
-from brainrender import Scene
+
+MAX_LOAD_WORKERS = 8
+
+# Accessor for the VTK dataset inside a vedo actor, resolved on first use.
+_VEDO_EXTRACT = None
+
+
+def _resolve_vedo_extract(actor):
+    """Pick the accessor that exposes the underlying VTK dataset for this vedo version."""
+    # Newer versions of vedo/brainrender
+    if hasattr(actor, 'polydata'):
+        return operator.methodcaller('polydata')
+    if hasattr(actor, 'dataset'):
+        return operator.attrgetter('dataset')
+    # Ultimate fallback if it's an older vedo object
+    return operator.attrgetter('_polydata')
+
 
 def _vedo_mesh_to_pyvista(actor):
     """Converts a brainrender (vedo) actor to a PyVista PolyData object."""
-    
+    global _VEDO_EXTRACT
+
     # Brainrender sometimes returns a list of actors. If so, grab the first one.
     if isinstance(actor, list):
         actor = actor[0]
-        
-    # Both Vedo and PyVista run on VTK. 
+
+    # Both Vedo and PyVista run on VTK.
     # We can just extract the underlying VTK dataset and wrap it instantly!
     try:
-        # Newer versions of vedo/brainrender
-        if hasattr(actor, 'polydata'):
-            vtk_mesh = actor.polydata() 
-            return pv.wrap(vtk_mesh)
-        elif hasattr(actor, 'dataset'):
-            return pv.wrap(actor.dataset)
-        else:
-            # Ultimate fallback if it's an older vedo object
-            return pv.wrap(actor._polydata)
-            
+        if _VEDO_EXTRACT is None:
+            _VEDO_EXTRACT = _resolve_vedo_extract(actor)
+        return pv.wrap(_VEDO_EXTRACT(actor))
     except Exception as e:
         raise RuntimeError(f"Could not extract VTK data from Brainrender actor: {e}")
 
 
+@lru_cache(maxsize=8)
+def _get_atlas(atlas_name: str) -> BrainGlobeAtlas:
+    """Return a shared BrainGlobeAtlas instance (metadata is read from disk only once)."""
+    return BrainGlobeAtlas(atlas_name)
+
+
+@lru_cache(maxsize=64)
+def _read_mesh_cached(mesh_path: str) -> pv.PolyData:
+    """Read a mesh file once; callers get shallow copies via _read_mesh."""
+    return pv.read(mesh_path)
+
+
+def _read_mesh(mesh_path) -> pv.PolyData:
+    """Return a shallow copy of the cached mesh so callers can't mutate the cached entry."""
+    return _read_mesh_cached(str(mesh_path)).copy(deep=False)
 
+
+@lru_cache(maxsize=8)
+def _acronym_index(atlas_name: str) -> dict[str, dict]:
+    """Map each structure acronym to its structure record (built once per atlas)."""
+    atlas = _get_atlas(atlas_name)
+    return {s["acronym"]: s for s in atlas.structures.values()}
+
+
+@lru_cache(maxsize=8)
 def get_region_acronyms(atlas_name: str = "allen_mouse_100um") -> list[str]:
     """
     Return a sorted list of all valid region acronyms from the atlas.
@@ -38,7 +73,7 @@ def get_region_acronyms(atlas_name: str = "allen_mouse_100um") -> list[str]:
     Iterates through atlas.structures.values() and collects the 'acronym'
     field for each structure.
     """
-    atlas = BrainGlobeAtlas(atlas_name)
+    atlas = _get_atlas(atlas_name)
     acronyms = sorted({s["acronym"] for s in atlas.structures.values()})
     return acronyms
 
@@ -48,9 +83,9 @@ def load_root_brain_mesh(atlas_name="allen_mouse_100um"):
     Directly loads the atlas mesh as a PyVista object,
     completely bypassing Brainrender and Vedo!
     """
-    atlas = BrainGlobeAtlas(atlas_name)
+    atlas = _get_atlas(atlas_name)
     mesh_path = atlas.structures["root"]["mesh_filename"]
-    return pv.read(mesh_path)
+    return _read_mesh(mesh_path)
 
 
 def load_region_mesh(region_name: str, atlas_name: str = "allen_mouse_100um") -> pv.PolyData:
@@ -74,24 +109,47 @@ def load_region_mesh(region_name: str, atlas_name: str = "allen_mouse_100um") ->
     ValueError
         If no structure has the given acronym.
     """
-    atlas = BrainGlobeAtlas(atlas_name)
-    for structure in atlas.structures.values():
-        if structure["acronym"] == region_name:
-            mesh_path = structure["mesh_filename"]
-            return pv.read(mesh_path)
-    raise ValueError(f"No atlas structure with acronym '{region_name}'.")
+    structure = _acronym_index(atlas_name).get(region_name)
+    if structure is None:
+        raise ValueError(f"No atlas structure with acronym '{region_name}'.")
+    return _read_mesh(structure["mesh_filename"])
+
+
+def preload_region_meshes(region_names: list[str], atlas_name: str = "allen_mouse_100um") -> None:
+    """
+    Read several region meshes concurrently into the mesh cache.
+
+    Later load_region_mesh calls for these regions are cache hits. File reads
+    overlap; how much of the parsing overlaps depends on whether the VTK build
+    releases the GIL. Unknown acronyms and unreadable files are skipped here;
+    load_region_mesh raises for them as usual.
+    """
+    index = _acronym_index(atlas_name)
+    paths = [
+        str(index[name]["mesh_filename"]) for name in region_names if name in index
+    ]
+    if len(paths) < 2:
+        return
+
+    def read(path: str) -> None:
+        try:
+            _read_mesh_cached(path)
+        except Exception:
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(paths))) as pool:
+        list(pool.map(read, paths))
 
 
 def get_region_full_name(region_acronym: str, atlas_name: str = "allen_mouse_100um") -> str:
     """
     Return the full display name for a region acronym.
 
-    Iterates atlas.structures.values() to find the structure with matching acronym,
+    Looks up the structure with matching acronym in the cached acronym index,
     then returns structure['name']. Falls back to the acronym if not found.
     """
-    atlas = BrainGlobeAtlas(atlas_name)
-    for structure in atlas.structures.values():
-        if structure.get("acronym") == region_acronym:
-            return structure.get("name", region_acronym)
-    return region_acronym
+    structure = _acronym_index(atlas_name).get(region_acronym)
+    if structure is None:
+        return region_acronym
+    return structure.get("name", region_acronym)
 
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyvista as pv
+
+BAKED_MESH_DIR = Path(__file__).resolve().parent.parent / "data" / "baked"
+MESH3D_KEYS = ("x", "y", "z", "i", "j", "k")
+
+
+def extract_plotly_data(mesh: pv.PolyData) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract vertices and faces from a PyVista mesh for Plotly Mesh3d.
+
+    Returns
+    -------
+    vertices : np.ndarray
+        mesh.points after triangulation, as float32 (WebGL precision; halves the payload).
+    faces : np.ndarray
+        mesh.faces reshaped to (n_triangles, 3) int32 vertex indices.
+    """
+    # Atlas region meshes are usually all triangles already; skip rebuilding the cell array.
+    if not mesh.is_all_triangles:
+        mesh = mesh.triangulate()
+    vertices = np.ascontiguousarray(mesh.points, dtype=np.float32)
+    # Triangulated PolyData stores faces as flat [3, i, j, k, 3, i, j, k, ...].
+    raw = np.asarray(mesh.faces, dtype=np.int32)
+    faces = np.empty((raw.size // 4, 3), dtype=np.int32)
+    faces[:, 0] = raw[1::4]
+    faces[:, 1] = raw[2::4]
+    faces[:, 2] = raw[3::4]
+    return vertices, faces
+
+
+def mesh3d_arrays(vertices: np.ndarray, faces: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Split vertices and faces into the contiguous 1-D x/y/z/i/j/k arrays taken by go.Mesh3d.
+
+    Column slices of the (n, 3) arrays are strided views; copying them once here
+    means Plotly serializes contiguous buffers instead of re-copying every rerun.
+    """
+    return {
+        "x": np.ascontiguousarray(vertices[:, 0]),
+        "y": np.ascontiguousarray(vertices[:, 1]),
+        "z": np.ascontiguousarray(vertices[:, 2]),
+        "i": np.ascontiguousarray(faces[:, 0], dtype=np.int32),
+        "j": np.ascontiguousarray(faces[:, 1], dtype=np.int32),
+        "k": np.ascontiguousarray(faces[:, 2], dtype=np.int32),
+    }
+
+
+def voxel_center_arrays(vox: pv.DataSet) -> Dict[str, np.ndarray]:
+    """
+    Contiguous float32 x/y/z arrays of voxel cell centers for a Plotly Scatter3d.
+
+    One marker per voxel replaces the 12 triangles of its extracted cube surface.
+    """
+    centers = np.asarray(vox.cell_centers().points, dtype=np.float32)
+    return {
+        "x": np.ascontiguousarray(centers[:, 0]),
+        "y": np.ascontiguousarray(centers[:, 1]),
+        "z": np.ascontiguousarray(centers[:, 2]),
+    }
+
+
+def merge_plotly_arrays(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatenate several meshes' (or point clouds') Plotly arrays into one set of buffers.
+
+    The i/j/k face indices of each part, when present, are offset by the number
+    of vertices in the parts before it.
+    """
+    merged = {key: np.concatenate([part[key] for part in parts]) for key in ("x", "y", "z")}
+    if "i" in parts[0]:
+        vertex_offsets = np.cumsum([0] + [part["x"].size for part in parts[:-1]])
+        face_bounds = np.cumsum([0] + [part["i"].size for part in parts])
+        for key in ("i", "j", "k"):
+            # Concatenate into one int32 buffer, then offset each part's slice in place.
+            indices = np.concatenate([part[key] for part in parts]).astype(np.int32, copy=False)
+            for offset, start, stop in zip(vertex_offsets, face_bounds[:-1], face_bounds[1:]):
+                indices[start:stop] += offset
+            merged[key] = indices
+    return merged
+
+
+def baked_mesh_path(region_name: str, atlas_name: str = "allen_mouse_100um") -> Path:
+    """Path of the baked Mesh3d arrays for a region acronym in the given atlas."""
+    return BAKED_MESH_DIR / atlas_name / f"{region_name.replace('/', '_')}.npz"
+
+
+def save_baked_mesh3d(
+    region_name: str,
+    mesh_arrays: Dict[str, np.ndarray],
+    volume: float,
+    center: Tuple[float, float, float],
+    atlas_name: str = "allen_mouse_100um",
+) -> Path:
+    """
+    Write a region's Mesh3d arrays, volume and center to BAKED_MESH_DIR.
+
+    Files are uncompressed, so loading is a plain read.
+    """
+    path = baked_mesh_path(region_name, atlas_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        path,
+        volume=np.float64(volume),
+        center=np.asarray(center, dtype=np.float64),
+        **{key: mesh_arrays[key] for key in MESH3D_KEYS},
+    )
+    return path
+
+
+def load_baked_mesh3d(
+    region_name: str, atlas_name: str = "allen_mouse_100um"
+) -> Optional[Dict[str, np.ndarray]]:
+    """Load a region's baked Mesh3d arrays, or None if it has not been baked."""
+    path = baked_mesh_path(region_name, atlas_name)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in MESH3D_KEYS}
+
+
+def load_baked_mesh_stats(
+    region_name: str, atlas_name: str = "allen_mouse_100um"
+) -> Optional[Tuple[float, Tuple[float, float, float]]]:
+    """Load a region's baked (volume, center), or None if it has not been baked."""
+    path = baked_mesh_path(region_name, atlas_name)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        if "volume" not in data.files or "center" not in data.files:
+            return None
+        return float(data["volume"]), tuple(float(c) for c in data["center"])
@@ -1,30 +1,157 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
 import pyvista as pv
 
+MAX_VOXELS = 200_000  # bounding-box voxel budget per mesh, keeps voxelization latency bounded
+VOXEL_CACHE_DIR = Path.home() / ".brain_model" / "voxel_cache"
+VOXEL_CACHE_SCHEMA = 1  # bump when the cached file layout changes
+
 
-def voxelize_mesh(mesh: pv.PolyData) -> pv.UnstructuredGrid:
+def voxel_spacing(mesh: pv.PolyData, resolution: int = 30) -> float:
+    """
+    Voxel size for a mesh, derived from its extent.
+
+    The X-axis length (max_x - min_x) from mesh.bounds is divided by
+    `resolution`, giving roughly that many voxels along X. If the bounding box
+    would then hold more than MAX_VOXELS voxels, the spacing is coarsened to fit.
+
+    Raises
+    ------
+    ValueError
+        If the mesh has a degenerate X extent.
+    """
+    x_min, x_max, y_min, y_max, z_min, z_max = mesh.bounds
+    x_length = x_max - x_min
+    if x_length <= 0:
+        raise ValueError("Mesh has degenerate X extent.")
+    voxel_size = x_length / resolution
+    box_volume = x_length * (y_max - y_min) * (z_max - z_min)
+    if box_volume / voxel_size ** 3 > MAX_VOXELS:
+        voxel_size = (box_volume / MAX_VOXELS) ** (1.0 / 3.0)
+    return voxel_size
+
+
+def voxelize_mesh(
+    mesh: pv.PolyData,
+    resolution: int = 30,
+    spacing: Optional[float] = None,
+    return_type: str = "grid",
+) -> Union[pv.UnstructuredGrid, pv.ImageData]:
     """
     Voxelize a closed surface mesh using a density derived from its extent.
 
-    The voxel size is computed from the mesh bounding box so that the result
-    is tractable regardless of coordinate units (e.g. micrometers). The
-    X-axis length (max_x - min_x) from mesh.bounds is divided by 30 to get
-    the voxel spacing, giving roughly 30 voxels along the longest axis.
+    The voxel size is computed from the mesh bounding box (see voxel_spacing)
+    so that the result is tractable regardless of coordinate units
+    (e.g. micrometers). Results are cached on disk under VOXEL_CACHE_DIR.
 
     Parameters
     ----------
     mesh : pyvista.PolyData
         Closed surface mesh (e.g. brain region).
+    resolution : int, optional
+        Approximate number of voxels along the X axis. Default 30.
+    spacing : float, optional
+        Explicit voxel size; overrides `resolution` when given.
+    return_type : {'grid', 'image'}, optional
+        'grid' (default) returns the voxel cells as an UnstructuredGrid.
+        'image' returns a pyvista.ImageData over the voxel bounding box with a
+        uint8 cell_data['occupancy'] mask: 1 byte per voxel instead of 8 points
+        and a hexahedron cell. Use ``.threshold(0.5)`` to get the cubes back.
 
     Returns
     -------
-    pyvista.UnstructuredGrid
+    pyvista.UnstructuredGrid or pyvista.ImageData
         Voxel grid filling the mesh interior.
     """
-    bounds = mesh.bounds
-    x_length = bounds[1] - bounds[0]
-    if x_length <= 0:
-        raise ValueError("Mesh has degenerate X extent.")
-    voxel_size = x_length / 30.0
-    return mesh.voxelize(spacing=voxel_size)
+    if return_type not in ("grid", "image"):
+        raise ValueError(f"Unknown return_type '{return_type}'; expected 'grid' or 'image'.")
+    if spacing is None:
+        spacing = voxel_spacing(mesh, resolution)
+    return _voxelize_cached(mesh, spacing, return_type)
+
+
+def _voxel_cache_path(mesh: pv.PolyData, spacing: float, return_type: str) -> Path:
+    """
+    Disk cache location for a voxelization.
+
+    Voxelization is deterministic in (mesh, spacing), so the key is the mesh's
+    point/cell counts and bounds plus the spacing and return type. The cache
+    schema and the PyVista version are part of the key, so a format change or
+    a PyVista upgrade starts a fresh set of entries.
+    """
+    key = repr((
+        VOXEL_CACHE_SCHEMA,
+        pv.__version__,
+        mesh.n_points,
+        mesh.n_cells,
+        tuple(mesh.bounds),
+        spacing,
+        return_type,
+    ))
+    suffix = ".vti" if return_type == "image" else ".vtu"
+    return VOXEL_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}{suffix}"
+
+
+def _voxelize_cached(
+    mesh: pv.PolyData, spacing: float, return_type: str
+) -> Union[pv.UnstructuredGrid, pv.ImageData]:
+    """
+    Voxelize with a resolved spacing, reading and writing the disk cache.
+
+    An unreadable or empty cache file is treated as a miss and removed.
+    Results are written to a temporary file and moved into place, so readers
+    never see a partial file. Cache I/O failures fall back to computing.
+    """
+    path = _voxel_cache_path(mesh, spacing, return_type)
+    if path.exists():
+        try:
+            cached = pv.read(path)
+        except OSError:
+            cached = None
+        if cached is not None and cached.n_cells > 0:
+            return cached
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    vox = mesh.voxelize(spacing=spacing)
+    result = vox if return_type == "grid" else _occupancy_image(vox, spacing)
+    if result.n_cells == 0:
+        return result
+
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.stem}.", suffix=path.suffix)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        result.save(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+    return result
+
+
+def _occupancy_image(vox: pv.UnstructuredGrid, spacing: float) -> pv.ImageData:
+    """Rasterize voxel cells of size `spacing` into an ImageData occupancy mask."""
+    if vox.n_cells == 0:
+        return pv.ImageData()
+    origin = np.array(vox.bounds[::2])
+    dims = np.maximum(np.rint((np.array(vox.bounds[1::2]) - origin) / spacing).astype(int), 1)
+    # Cell (i, j, k) of the image, x varying fastest as in VTK.
+    ijk = np.floor((vox.cell_centers().points - origin) / spacing).astype(int)
+    ijk = np.clip(ijk, 0, dims - 1)
+    occupancy = np.zeros(int(np.prod(dims)), dtype=np.uint8)
+    occupancy[ijk[:, 0] + dims[0] * (ijk[:, 1] + dims[1] * ijk[:, 2])] = 1
+    image = pv.ImageData(dimensions=tuple(dims + 1), spacing=(spacing,) * 3, origin=tuple(origin))
+    image.cell_data["occupancy"] = occupancy
+    return image